@@ -0,0 +1,142 @@
+"""
+Shared pytest configuration for the High School Management System API tests
+"""
+
+import os
+
+import httpx
+import orjson
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, request_response
+from fastapi.testclient import TestClient
+from src.app import app, activities
+
+# "strict" (the default) runs the app's real response class, "fast" opts into
+# encoding and decoding API responses with orjson. orjson does not encode
+# exactly like Starlette: it writes NaN and Infinity as null where
+# JSONResponse raises ValueError, so a fast run can pass a response that
+# fails in production
+TEST_MODE = os.environ.get("API_TEST_MODE", "strict")
+
+
+class _ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+
+    def render(self, content):
+        return orjson.dumps(content)
+
+
+_httpx_response_json = httpx.Response.json
+
+
+def _orjson_response_json(response, **kwargs):
+    """Decode an httpx response body with orjson, or with httpx when given kwargs"""
+    if kwargs:
+        return _httpx_response_json(response, **kwargs)
+    return orjson.loads(response.content)
+
+
+# Participants of each activity mutated during the current test, captured on
+# the first mutation as activity name -> (participants list, original tuple)
+_touched_participants = {}
+
+_LIST_MUTATORS = (
+    "append", "extend", "insert", "pop", "remove", "clear", "sort", "reverse",
+    "__setitem__", "__delitem__", "__iadd__", "__imul__",
+)
+
+
+class _TrackedList(list):
+    """Participants list that snapshots itself before its first mutation"""
+
+    def __init__(self, activity_name, participants):
+        super().__init__(participants)
+        self.activity_name = activity_name
+
+
+def _tracked(method_name):
+    """Wrap a list mutator so it snapshots the list before changing it"""
+    method = getattr(list, method_name)
+
+    def wrapper(self, *args, **kwargs):
+        if self.activity_name not in _touched_participants:
+            _touched_participants[self.activity_name] = (self, tuple(self))
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = method_name
+    return wrapper
+
+
+for _method_name in _LIST_MUTATORS:
+    setattr(_TrackedList, _method_name, _tracked(_method_name))
+
+for _name, _details in activities.items():
+    _details["participants"] = _TrackedList(_name, _details["participants"])
+
+
+def _restore_touched_participants():
+    """Put back the original participants of every touched activity"""
+    for name, (participants, original) in _touched_participants.items():
+        list.__setitem__(participants, slice(None), original)
+        activities[name]["participants"] = participants
+    _touched_participants.clear()
+
+
+@pytest.fixture
+def reset_activities():
+    """Restore the participants of activities mutated during a test"""
+    yield
+    _restore_touched_participants()
+
+
+@pytest.fixture(autouse=True)
+def _check_activities_reset(request):
+    """Fail a test that mutates participants without requesting reset_activities"""
+    yield
+    if _touched_participants and "reset_activities" not in request.fixturenames:
+        leaked = sorted(_touched_participants)
+        _restore_touched_participants()
+        pytest.fail(f"Test mutated participants of {leaked} without requesting reset_activities")
+
+
+def _use_orjson(mp):
+    """Encode and decode API responses with orjson until mp is undone"""
+    # Routes bind their response class when built, so rebuild each handler
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            mp.setattr(route, "response_class", _ORJSONResponse)
+            mp.setattr(route, "app", request_response(route.get_route_handler()))
+    mp.setattr(httpx.Response, "json", _orjson_response_json)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_json_responses():
+    """Encode and decode API responses with orjson when running in fast mode"""
+    if TEST_MODE != "fast":
+        yield
+        return
+
+    with pytest.MonkeyPatch.context() as mp:
+        _use_orjson(mp)
+        yield
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Create a test client shared across the whole test session"""
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warmup(client, fast_json_responses):
+    """Serve the read endpoints once so the first real test skips cold-start work"""
+    client.get("/api/activities")
+    client.get("/activities")
+
+
+@pytest.fixture(scope="session")
+def activities_response(client):
+    """Decoded GET /api/activities payload, fetched once per session"""
+    return client.get("/api/activities").json()
@@ -2,35 +2,31 @@
 Tests for the High School Management System API
 """
 
+from urllib.parse import quote
+
 import pytest
-from fastapi.testclient import TestClient
+from fastapi.routing import APIRoute
 from src.app import app, activities
+from tests.conftest import _ORJSONResponse, _use_orjson
 
+# Activity names used by the tests and their endpoint URLs, percent-encoded
+SOCCER = "Soccer Team"
+BASKETBALL = "Basketball Club"
+CHESS = "Chess Club"
+INVALID = "NonExistent Activity"
 
-@pytest.fixture
-def client():
-    """Create a test client"""
-    return TestClient(app)
-
-
-@pytest.fixture(autouse=True)
-def reset_activities():
-    """Reset activities data before each test"""
-    # Store original state
-    original_activities = {}
-    for name, details in activities.items():
-        original_activities[name] = {
-            "description": details["description"],
-            "schedule": details["schedule"],
-            "max_participants": details["max_participants"],
-            "participants": details["participants"].copy()
-        }
-    
-    yield
-    
-    # Restore original state after test
-    for name, details in original_activities.items():
-        activities[name] = details
+SOCCER_PARTICIPANTS = f"/api/activities/{quote(SOCCER)}/participants"
+SOCCER_SIGNUP = f"/activities/{quote(SOCCER)}/signup"
+BASKETBALL_PARTICIPANTS = f"/api/activities/{quote(BASKETBALL)}/participants"
+BASKETBALL_SIGNUP = f"/activities/{quote(BASKETBALL)}/signup"
+CHESS_PARTICIPANTS = f"/api/activities/{quote(CHESS)}/participants"
+CHESS_SIGNUP = f"/activities/{quote(CHESS)}/signup"
+INVALID_PARTICIPANTS = f"/api/activities/{quote(INVALID)}/participants"
+INVALID_SIGNUP = f"/activities/{quote(INVALID)}/signup"
+
+_REQUIRED_ACTIVITY_FIELDS = frozenset({
+    "id", "name", "description", "schedule", "max_participants", "current_participants"
+})
 
 
 class TestRootEndpoint:
@@ -55,25 +51,19 @@ class TestGetActivitiesAPI:
         assert isinstance(data, list)
         assert len(data) > 0
     
-    def test_get_activities_contains_required_fields(self, client):
+    def test_get_activities_contains_required_fields(self, activities_response):
         """Test that each activity contains required fields"""
-        response = client.get("/api/activities")
-        data = response.json()
+        data = activities_response
         
-        required_fields = ["id", "name", "description", "schedule", "max_participants", "current_participants"]
         for activity in data:
-            for field in required_fields:
-                assert field in activity
+            assert _REQUIRED_ACTIVITY_FIELDS <= activity.keys()
     
-    def test_get_activities_participant_count(self, client):
+    def test_get_activities_participant_count(self, activities_response):
         """Test that current_participants count is accurate"""
-        response = client.get("/api/activities")
-        data = response.json()
+        data = activities_response
         
-        for activity in data:
-            activity_name = activity["id"]
-            expected_count = len(activities[activity_name]["participants"])
-            assert activity["current_participants"] == expected_count
+        expected = {name: len(a["participants"]) for name, a in activities.items()}
+        assert {a["id"]: a["current_participants"] for a in data} == expected
 
 
 class TestGetActivityParticipants:
@@ -81,7 +71,7 @@ class TestGetActivityParticipants:
     
     def test_get_participants_for_valid_activity(self, client):
         """Test getting participants for a valid activity"""
-        response = client.get("/api/activities/Soccer Team/participants")
+        response = client.get(SOCCER_PARTICIPANTS)
         assert response.status_code == 200
         
         data = response.json()
@@ -93,20 +83,14 @@ class TestGetActivityParticipants:
     
     def test_get_participants_returns_correct_emails(self, client):
         """Test that returned participants match the activity data"""
-        activity_id = "Soccer Team"
-        response = client.get(f"/api/activities/{activity_id}/participants")
+        activity_id = SOCCER
+        response = client.get(SOCCER_PARTICIPANTS)
         data = response.json()
         
         expected_emails = activities[activity_id]["participants"]
         returned_emails = [p["email"] for p in data]
         
         assert set(returned_emails) == set(expected_emails)
-    
-    def test_get_participants_for_invalid_activity(self, client):
-        """Test getting participants for non-existent activity"""
-        response = client.get("/api/activities/NonExistent Activity/participants")
-        assert response.status_code == 404
-        assert "Activity not found" in response.json()["detail"]
 
 
 class TestGetActivities:
@@ -119,17 +103,17 @@ class TestGetActivities:
         
         data = response.json()
         assert isinstance(data, dict)
-        assert "Soccer Team" in data
-        assert "Basketball Club" in data
+        assert SOCCER in data
+        assert BASKETBALL in data
 
 
 class TestSignupForActivity:
     """Tests for the POST /activities/{activity_name}/signup endpoint"""
     
-    def test_signup_new_participant(self, client):
+    def test_signup_new_participant(self, client, reset_activities):
         """Test signing up a new participant"""
         response = client.post(
-            "/activities/Soccer Team/signup?email=newstudent@mergington.edu"
+            SOCCER_SIGNUP, params={"email": "newstudent@mergington.edu"}
         )
         assert response.status_code == 200
         
@@ -138,37 +122,26 @@ class TestSignupForActivity:
         assert "newstudent@mergington.edu" in data["message"]
         
         # Verify participant was added
-        assert "newstudent@mergington.edu" in activities["Soccer Team"]["participants"]
+        assert "newstudent@mergington.edu" in activities[SOCCER]["participants"]
     
-    def test_signup_duplicate_participant(self, client):
+    def test_signup_duplicate_participant(self, client, reset_activities):
         """Test that duplicate signup is rejected"""
         email = "alex@mergington.edu"  # Already in Soccer Team
         
-        response = client.post(f"/activities/Soccer Team/signup?email={email}")
+        response = client.post(SOCCER_SIGNUP, params={"email": email})
         assert response.status_code == 400
         assert "already signed up" in response.json()["detail"]
-    
-    def test_signup_for_invalid_activity(self, client):
-        """Test signing up for non-existent activity"""
-        response = client.post(
-            "/activities/NonExistent Activity/signup?email=student@mergington.edu"
-        )
-        assert response.status_code == 404
-        assert "Activity not found" in response.json()["detail"]
 
 
 class TestUnregisterParticipant:
     """Tests for the DELETE /api/activities/{activity_id}/participants/{email} endpoint"""
     
-    def test_unregister_existing_participant(self, client):
+    def test_unregister_existing_participant(self, client, reset_activities):
         """Test unregistering an existing participant"""
-        activity_id = "Soccer Team"
+        activity_id = SOCCER
         email = "alex@mergington.edu"
         
-        # Verify participant exists before deletion
-        assert email in activities[activity_id]["participants"]
-        
-        response = client.delete(f"/api/activities/{activity_id}/participants/{email}")
+        response = client.delete(f"{SOCCER_PARTICIPANTS}/{quote(email)}")
         assert response.status_code == 200
         
         data = response.json()
@@ -181,63 +154,86 @@ class TestUnregisterParticipant:
     def test_unregister_nonexistent_participant(self, client):
         """Test unregistering a participant not in the activity"""
         response = client.delete(
-            "/api/activities/Soccer Team/participants/nonexistent@mergington.edu"
+            f"{SOCCER_PARTICIPANTS}/{quote('nonexistent@mergington.edu')}"
         )
         assert response.status_code == 404
         assert "Participant not found" in response.json()["detail"]
     
-    def test_unregister_from_invalid_activity(self, client):
-        """Test unregistering from non-existent activity"""
-        response = client.delete(
-            "/api/activities/NonExistent Activity/participants/student@mergington.edu"
-        )
-        assert response.status_code == 404
-        assert "Activity not found" in response.json()["detail"]
-    
-    def test_unregister_and_signup_again(self, client):
+    def test_unregister_and_signup_again(self, client, reset_activities):
         """Test that a participant can be unregistered and re-registered"""
-        activity_id = "Basketball Club"
+        activity_id = BASKETBALL
         email = "james@mergington.edu"
         
         # Unregister
-        response = client.delete(f"/api/activities/{activity_id}/participants/{email}")
+        response = client.delete(f"{BASKETBALL_PARTICIPANTS}/{quote(email)}")
         assert response.status_code == 200
-        assert email not in activities[activity_id]["participants"]
         
         # Sign up again
-        response = client.post(f"/activities/{activity_id}/signup?email={email}")
+        response = client.post(BASKETBALL_SIGNUP, params={"email": email})
         assert response.status_code == 200
         assert email in activities[activity_id]["participants"]
 
 
+class TestInvalidActivity:
+    """Tests for requests targeting a non-existent activity"""
+    
+    @pytest.mark.parametrize("method,path,params", [
+        ("GET", INVALID_PARTICIPANTS, None),
+        ("POST", INVALID_SIGNUP, {"email": "student@mergington.edu"}),
+        ("DELETE", f"{INVALID_PARTICIPANTS}/{quote('student@mergington.edu')}", None),
+    ])
+    def test_404_on_invalid_activity(self, client, method, path, params):
+        """Test that every endpoint rejects a non-existent activity"""
+        response = client.request(method, path, params=params)
+        assert response.status_code == 404
+        assert "Activity not found" in response.json()["detail"]
+
+
 class TestIntegration:
     """Integration tests for the complete workflow"""
     
-    def test_complete_participant_lifecycle(self, client):
+    def test_complete_participant_lifecycle(self, client, reset_activities):
         """Test the complete lifecycle of a participant"""
-        activity_id = "Chess Club"
+        activity_id = CHESS
         new_email = "testuser@mergington.edu"
         
-        # 1. Get initial participant count
-        response = client.get(f"/api/activities/{activity_id}/participants")
-        initial_count = len(response.json())
+        participants = activities[activity_id]["participants"]
+        initial_count = len(participants)
         
-        # 2. Sign up
-        response = client.post(f"/activities/{activity_id}/signup?email={new_email}")
+        # 1. Sign up
+        response = client.post(CHESS_SIGNUP, params={"email": new_email})
         assert response.status_code == 200
-        
-        # 3. Verify participant was added
-        response = client.get(f"/api/activities/{activity_id}/participants")
-        participants = response.json()
         assert len(participants) == initial_count + 1
-        assert any(p["email"] == new_email for p in participants)
+        assert new_email in participants
         
-        # 4. Unregister
-        response = client.delete(f"/api/activities/{activity_id}/participants/{new_email}")
+        # 2. Unregister
+        response = client.delete(f"{CHESS_PARTICIPANTS}/{quote(new_email)}")
         assert response.status_code == 200
         
-        # 5. Verify participant was removed
-        response = client.get(f"/api/activities/{activity_id}/participants")
-        participants = response.json()
-        assert len(participants) == initial_count
-        assert not any(p["email"] == new_email for p in participants)
+        # 3. Verify participant was removed through the API
+        response = client.get(CHESS_PARTICIPANTS)
+        api_participants = response.json()
+        assert len(api_participants) == initial_count
+        emails = {p["email"] for p in api_participants}
+        assert new_email not in emails
+
+
+class TestFastJsonMode:
+    """Tests for the orjson route swap used by API_TEST_MODE=fast"""
+    
+    def test_fast_mode_renders_responses_with_orjson(self, client, monkeypatch):
+        """Test that every API route is rebuilt to render with orjson"""
+        _use_orjson(monkeypatch)
+        routes = [route for route in app.routes if isinstance(route, APIRoute)]
+        assert all(route.response_class is _ORJSONResponse for route in routes)
+        
+        rendered = []
+        render = _ORJSONResponse.render
+        monkeypatch.setattr(
+            _ORJSONResponse, "render",
+            lambda self, content: rendered.append(content) or render(self, content),
+        )
+        response = client.get("/activities")
+        assert response.status_code == 200
+        assert rendered
+        assert response.json() == activities